@@ -21,6 +21,7 @@ from fnmatch import fnmatch
 from typing import Optional, Tuple, List, Dict, Any, Iterator, Generator
 from collections import defaultdict
 from dataclasses import dataclass
+from functools import cached_property
 
 # Handle SIGPIPE gracefully for Unix pipe compatibility (e.g., ./pm_encoder.py . | head)
 # This prevents BrokenPipeError tracebacks when output is piped and closed early
@@ -1461,6 +1462,11 @@ class TokenEstimator:
     _tiktoken_encoding = None
     _warning_shown: bool = False
 
+    # tiktoken counts keyed by content, mostly hit by the per-path overhead
+    # text that every budget pass re-estimates; the heuristic is not cached
+    _token_cache: Dict[str, int] = {}
+    _TOKEN_CACHE_MAX = 4096
+
     @classmethod
     def _check_tiktoken(cls) -> bool:
         """Lazily check if tiktoken is available."""
@@ -1473,6 +1479,33 @@ class TokenEstimator:
                 cls._tiktoken_available = False
         return cls._tiktoken_available
 
+    @classmethod
+    def _warn_heuristic(cls) -> None:
+        """Show the heuristic fallback warning once."""
+        if not cls._warning_shown:
+            print("WARNING: tiktoken not installed, using heuristic token estimation (~4 chars/token).",
+                  file=sys.stderr)
+            print("         Install with: pip install tiktoken", file=sys.stderr)
+            cls._warning_shown = True
+
+    @classmethod
+    def _cache_tokens(cls, content: str, tokens: int) -> None:
+        """Store a tiktoken count, evicting the oldest entry when full."""
+        if len(cls._token_cache) >= cls._TOKEN_CACHE_MAX:
+            del cls._token_cache[next(iter(cls._token_cache))]
+        cls._token_cache[content] = tokens
+
+    @staticmethod
+    def _format_overhead(file_path: Path) -> str:
+        """
+        PM format header + footer text for a file.
+
+        Header: "++++++++++ path ++++++++++\n"
+        Footer: "---------- path <32 char checksum> path ----------\n"
+        """
+        path_str = file_path.as_posix() if hasattr(file_path, 'as_posix') else str(file_path)
+        return f"++++++++++ {path_str} ++++++++++\n---------- {path_str} {'x'*32} {path_str} ----------\n"
+
     @classmethod
     def estimate_tokens(cls, content: str) -> int:
         """
@@ -1485,17 +1518,54 @@ class TokenEstimator:
             Estimated token count
         """
         if cls._check_tiktoken():
-            return len(cls._tiktoken_encoding.encode(content))
+            cached = cls._token_cache.get(content)
+            if cached is not None:
+                return cached
+            tokens = len(cls._tiktoken_encoding.encode(content))
+            cls._cache_tokens(content, tokens)
+            return tokens
         else:
-            # Show warning once
-            if not cls._warning_shown:
-                print("WARNING: tiktoken not installed, using heuristic token estimation (~4 chars/token).",
-                      file=sys.stderr)
-                print("         Install with: pip install tiktoken", file=sys.stderr)
-                cls._warning_shown = True
+            cls._warn_heuristic()
             # Heuristic: ~4 characters per token
             return len(content) // 4
 
+    @classmethod
+    def estimate_tokens_batch(cls, contents: List[str]) -> List[int]:
+        """
+        Estimate tokens for many texts at once.
+
+        Produces the same counts as calling estimate_tokens() per text, but
+        resolves the estimation method once and hands all uncached texts to
+        tiktoken's multi-threaded encode_batch in a single call.
+
+        Args:
+            contents: Texts to estimate
+
+        Returns:
+            Token counts in the same order as contents
+        """
+        if not cls._check_tiktoken():
+            cls._warn_heuristic()
+            return [len(content) // 4 for content in contents]
+
+        # Snapshot hits first: caching new counts below may evict them
+        counts: Dict[str, int] = {}
+        missing = []
+        for content in dict.fromkeys(contents):
+            cached = cls._token_cache.get(content)
+            if cached is None:
+                missing.append(content)
+            else:
+                counts[content] = cached
+
+        if missing:
+            encoded = cls._tiktoken_encoding.encode_batch(missing)
+            for content, tokens in zip(missing, encoded):
+                counts[content] = len(tokens)
+                cls._cache_tokens(content, len(tokens))
+
+        return [counts[c] for c in contents]
+
     @classmethod
     def estimate_file_tokens(cls, file_path: Path, content: str) -> int:
         """
@@ -1508,18 +1578,30 @@ class TokenEstimator:
         Returns:
             Total estimated tokens including format overhead
         """
-        # Content tokens
         content_tokens = cls.estimate_tokens(content)
-
-        # PM format overhead (header + footer)
-        # Header: "++++++++++ path ++++++++++\n"
-        # Footer: "---------- path <32 char checksum> path ----------\n"
-        path_str = file_path.as_posix() if hasattr(file_path, 'as_posix') else str(file_path)
-        overhead = f"++++++++++ {path_str} ++++++++++\n---------- {path_str} {'x'*32} {path_str} ----------\n"
-        overhead_tokens = cls.estimate_tokens(overhead)
+        overhead_tokens = cls.estimate_tokens(cls._format_overhead(file_path))
 
         return content_tokens + overhead_tokens
 
+    @classmethod
+    def estimate_file_tokens_batch(cls, files: List[Tuple[Path, str]]) -> List[int]:
+        """
+        Batched form of estimate_file_tokens().
+
+        Args:
+            files: List of (path, content) tuples
+
+        Returns:
+            Total estimated tokens per file, in input order
+        """
+        texts = []
+        for file_path, content in files:
+            texts.append(content)
+            texts.append(cls._format_overhead(file_path))
+
+        counts = cls.estimate_tokens_batch(texts)
+        return [counts[i] + counts[i + 1] for i in range(0, len(counts), 2)]
+
     @classmethod
     def get_method(cls) -> str:
         """Return the token estimation method being used."""
@@ -1578,6 +1660,21 @@ class BudgetReport:
     included_files: List[Tuple[Path, int, int, str]] = None  # (path, priority, tokens, method)
     truncated_count: int = 0
 
+    # Fixed summary block of print_report(), formatted in one pass
+    _HEADER_TEMPLATE = (
+        "{rule}\n"
+        "TOKEN BUDGET REPORT\n"
+        "{rule}\n"
+        "Budget:     {budget:,} tokens\n"
+        "Used:       {used:,} tokens ({used_percentage:.1f}%)\n"
+        "Remaining:  {remaining:,} tokens\n"
+        "Estimation: {estimation_method}\n"
+        "Strategy:   {strategy}\n"
+        "\n"
+        "Files included: {selected_count} ({full_count} full, {truncated_count} truncated)\n"
+        "Files dropped:  {dropped_count} (lowest priority first)"
+    )
+
     def __post_init__(self):
         if self.included_files is None:
             self.included_files = []
@@ -1592,42 +1689,63 @@ class BudgetReport:
         """Tokens remaining in budget."""
         return max(0, self.budget - self.used)
 
+    @cached_property
+    def by_path(self) -> Dict[Path, Tuple[Path, int, int, str]]:
+        """Included file entries keyed by path (built on first access)."""
+        return {entry[0]: entry for entry in self.included_files}
+
+    @cached_property
+    def dropped_by_path(self) -> Dict[Path, Tuple[Path, int, int]]:
+        """Dropped file entries keyed by path (built on first access)."""
+        return {entry[0]: entry for entry in self.dropped_files}
+
     def print_report(self, output=sys.stderr):
         """Print a formatted budget report."""
-        print("=" * 70, file=output)
-        print("TOKEN BUDGET REPORT", file=output)
-        print("=" * 70, file=output)
-        print(f"Budget:     {self.budget:,} tokens", file=output)
-        print(f"Used:       {self.used:,} tokens ({self.used_percentage:.1f}%)", file=output)
-        print(f"Remaining:  {self.remaining:,} tokens", file=output)
-        print(f"Estimation: {self.estimation_method}", file=output)
-        print(f"Strategy:   {self.strategy}", file=output)
-        print(file=output)
-
-        # Show files included with method
+        output.write(self.format_report())
+
+    def format_report(self) -> str:
+        """Build the formatted budget report as a single string."""
         full_count = sum(1 for f in self.included_files if f[3] == "full")
-        print(f"Files included: {self.selected_count} ({full_count} full, {self.truncated_count} truncated)", file=output)
-        print(f"Files dropped:  {self.dropped_count} (lowest priority first)", file=output)
+        lines = [self._HEADER_TEMPLATE.format(
+            rule="=" * 70,
+            budget=self.budget,
+            used=self.used,
+            used_percentage=self.used_percentage,
+            remaining=self.remaining,
+            estimation_method=self.estimation_method,
+            strategy=self.strategy,
+            selected_count=self.selected_count,
+            full_count=full_count,
+            truncated_count=self.truncated_count,
+            dropped_count=self.dropped_count,
+        )]
 
         # Show truncated files if any
         if self.truncated_count > 0:
-            print(file=output)
-            print("Auto-truncated files (structure mode):", file=output)
+            lines.append("")
+            lines.append("Auto-truncated files (structure mode):")
             truncated_list = [(p, pr, t) for p, pr, t, m in self.included_files if m == "truncated"]
             for path, priority, tokens in truncated_list[:5]:
-                print(f"  [P:{priority:3d}] {path} ({tokens:,} tokens)", file=output)
+                lines.append(f"  [P:{priority:3d}] {path} ({tokens:,} tokens)")
             if len(truncated_list) > 5:
-                print(f"  ... and {len(truncated_list) - 5} more", file=output)
+                lines.append(f"  ... and {len(truncated_list) - 5} more")
 
         if self.dropped_files:
-            print(file=output)
-            print("Dropped files:", file=output)
+            lines.append("")
+            lines.append("Dropped files:")
             for path, priority, tokens in self.dropped_files[:10]:  # Show top 10
-                print(f"  [P:{priority:3d}] {path} ({tokens:,} tokens)", file=output)
+                lines.append(f"  [P:{priority:3d}] {path} ({tokens:,} tokens)")
             if len(self.dropped_files) > 10:
-                print(f"  ... and {len(self.dropped_files) - 10} more", file=output)
+                lines.append(f"  ... and {len(self.dropped_files) - 10} more")
+
+        lines.append("=" * 70)
+        return "\n".join(lines) + "\n"
 
-        print("=" * 70, file=output)
+
+# Structure truncation results keyed by (analyzer class, content).
+# Analyzers are stateless, so identical content always truncates identically.
+_STRUCTURE_CACHE: Dict[Tuple[type, str], Tuple[str, bool]] = {}
+_STRUCTURE_CACHE_MAX = 256
 
 
 def _truncate_to_structure(
@@ -1645,20 +1763,28 @@ def _truncate_to_structure(
         return content, False
 
     analyzer = analyzer_registry.get_analyzer(path)
+    cache_key = (type(analyzer), content)
+    cached = _STRUCTURE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     lines = content.split('\n')
     structure_ranges = analyzer.get_structure_ranges(lines)
 
     if not structure_ranges:
         # No structure extraction available for this file type
-        return content, False
-
-    # Extract lines from structure ranges
-    kept_lines = []
-    for start, end in structure_ranges:
-        kept_lines.extend(lines[start-1:end])
+        result = (content, False)
+    else:
+        # Extract lines from structure ranges
+        kept_lines = []
+        for start, end in structure_ranges:
+            kept_lines.extend(lines[start-1:end])
+        result = ('\n'.join(kept_lines), True)
 
-    truncated = '\n'.join(kept_lines)
-    return truncated, True
+    if len(_STRUCTURE_CACHE) >= _STRUCTURE_CACHE_MAX:
+        _STRUCTURE_CACHE.clear()
+    _STRUCTURE_CACHE[cache_key] = result
+    return result
 
 
 def apply_token_budget(
@@ -1666,7 +1792,8 @@ def apply_token_budget(
     budget: int,
     lens_manager: 'LensManager',
     strategy: str = "drop",
-    analyzer_registry: 'LanguageAnalyzerRegistry' = None
+    analyzer_registry: 'LanguageAnalyzerRegistry' = None,
+    estimates: Optional[Dict[Path, int]] = None
 ) -> Tuple[List[Tuple[Path, str]], BudgetReport]:
     """
     Select files to fit within a token budget, prioritized by lens configuration.
@@ -1682,6 +1809,8 @@ def apply_token_budget(
             - "truncate": Force structure mode on files that don't fit
             - "hybrid": Auto-truncate files consuming >10% of budget
         analyzer_registry: LanguageAnalyzerRegistry for structure truncation
+        estimates: Optional precomputed estimate_file_tokens() results keyed
+            by path; only files missing from it are estimated here
 
     Returns:
         Tuple of (selected_files, report)
@@ -1698,9 +1827,16 @@ def apply_token_budget(
 
     # Step 1: Calculate tokens and get priorities
     file_data = []
+    total_estimate = 0
+    largest_estimate = 0
+    known = estimates or {}
+    unknown = [(path, content) for path, content in files_with_content if path not in known]
+    new_estimates = iter(TokenEstimator.estimate_file_tokens_batch(unknown))
     for path, content in files_with_content:
-        tokens = TokenEstimator.estimate_file_tokens(path, content)
+        tokens = known[path] if path in known else next(new_estimates)
         priority = lens_manager.get_file_priority(path) if lens_manager else 50
+        total_estimate += tokens
+        largest_estimate = max(largest_estimate, tokens)
         file_data.append({
             'path': path,
             'content': content,
@@ -1713,9 +1849,31 @@ def apply_token_budget(
     # Step 2: Sort by priority (DESC) then path (ASC) for determinism
     file_data.sort(key=lambda x: (-x['priority'], x['path'].as_posix()))
 
-    # Step 3: For hybrid strategy, pre-truncate large files
-    if strategy == 'hybrid' and analyzer_registry:
-        budget_threshold = budget * HYBRID_THRESHOLD
+    # Fast path: everything fits and hybrid has nothing to pre-truncate,
+    # so every file is included in full without running the strategy loop
+    hybrid_active = strategy == 'hybrid' and analyzer_registry is not None
+    budget_threshold = budget * HYBRID_THRESHOLD
+    if total_estimate <= budget and not (
+        hybrid_active and largest_estimate > budget_threshold
+    ):
+        report = BudgetReport(
+            budget=budget,
+            used=total_estimate,
+            selected_count=len(file_data),
+            dropped_count=0,
+            dropped_files=[],
+            estimation_method=TokenEstimator.get_method(),
+            strategy=strategy,
+            included_files=[
+                (fd['path'], fd['priority'], fd['tokens'], 'full') for fd in file_data
+            ],
+            truncated_count=0
+        )
+        return [(fd['path'], fd['content']) for fd in file_data], report
+
+    # Step 3: For hybrid strategy, pre-truncate large files.
+    # Files at or below the threshold never reach the analyzer.
+    if hybrid_active and largest_estimate > budget_threshold:
         for fd in file_data:
             if fd['tokens'] > budget_threshold:
                 truncated_content, was_truncated = _truncate_to_structure(
@@ -2632,8 +2790,8 @@ Regenerate with: ./pm_encoder.py . --init-prompt --init-lens {lens_name} --targe
         print(f"   Detected commands: {len(commands)}", file=sys.stderr)
 
 
-def main():
-    """Main entry point for the script."""
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser."""
     parser = argparse.ArgumentParser(
         description="Serialize project files into the Plus/Minus format with intelligent truncation.",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -2732,8 +2890,31 @@ Examples:
                              "  xml: XML with file tags\n"
                              "  markdown/md: Markdown with code blocks")
 
-    args = parser.parse_args()
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments (defaults to sys.argv[1:])."""
+    return build_arg_parser().parse_args(argv)
+
 
+def run(args: argparse.Namespace):
+    """
+    Run pm_encoder with already-parsed arguments.
+
+    Args:
+        args: Namespace as returned by parse_args(). args.output is closed
+            on completion, including error exits, unless it is sys.stdout.
+    """
+    try:
+        _run(args)
+    finally:
+        if args.output is not sys.stdout:
+            args.output.close()
+
+
+def _run(args: argparse.Namespace):
+    """Body of run(); leaves closing args.output to the caller."""
     # Handle special commands that don't need project_root
     if args.create_plugin:
         create_plugin_template(args.create_plugin)
@@ -2745,7 +2926,7 @@ Examples:
 
     # Validate project_root is provided for normal operations
     if not args.project_root:
-        parser.error("project_root is required (unless using --create-plugin or --plugin-prompt)")
+        build_arg_parser().error("project_root is required (unless using --create-plugin or --plugin-prompt)")
 
     if not args.project_root.is_dir():
         print(f"Error: Project root '{args.project_root}' is not a valid directory.", file=sys.stderr)
@@ -2843,30 +3024,32 @@ Examples:
             print(f"\n⚠️  WARNING: --stream mode ignores --sort-by and --sort-order flags.", file=sys.stderr)
             print(f"    Files will be emitted in directory traversal order (depth-first).", file=sys.stderr)
 
-    try:
-        serialize(
-            args.project_root,
-            args.output,
-            ignore_patterns,
-            include_patterns,
-            sort_by_arg,
-            sort_order_arg,
-            truncate_lines=truncate_arg,
-            truncate_mode=truncate_mode_arg,
-            truncate_summary=args.truncate_summary,
-            truncate_exclude=truncate_exclude_arg,
-            show_stats=args.truncate_stats or truncate_arg > 0,
-            language_plugins_dir=args.language_plugins,
-            lens_manager=lens_manager if args.lens else None,
-            stream_mode=stream_mode,
-            token_budget=token_budget,
-            budget_strategy=args.budget_strategy,
-            output_format=args.format,
-        )
-        print(f"\nSuccessfully serialized project.", file=sys.stderr)
-    finally:
-        if args.output is not sys.stdout:
-            args.output.close()
+    serialize(
+        args.project_root,
+        args.output,
+        ignore_patterns,
+        include_patterns,
+        sort_by_arg,
+        sort_order_arg,
+        truncate_lines=truncate_arg,
+        truncate_mode=truncate_mode_arg,
+        truncate_summary=args.truncate_summary,
+        truncate_exclude=truncate_exclude_arg,
+        show_stats=args.truncate_stats or truncate_arg > 0,
+        language_plugins_dir=args.language_plugins,
+        lens_manager=lens_manager if args.lens else None,
+        stream_mode=stream_mode,
+        token_budget=token_budget,
+        budget_strategy=args.budget_strategy,
+        output_format=args.format,
+    )
+    print(f"\nSuccessfully serialized project.", file=sys.stderr)
+
+
+def main():
+    """Main entry point for the script."""
+    run(parse_args())
+
 
 if __name__ == "__main__":  # pragma: no cover
     main()
@@ -0,0 +1,13 @@
+"""
+pytest configuration for the classic Python test suite.
+
+Makes pm_encoder.py (one directory up) importable once per session, so
+test modules don't each need to patch sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+_PM_ENCODER_DIR = str(Path(__file__).parent.parent)
+if _PM_ENCODER_DIR not in sys.path:
+    sys.path.insert(0, _PM_ENCODER_DIR)
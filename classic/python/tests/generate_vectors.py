@@ -29,6 +29,22 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import pm_encoder
 
 
+def md5_hexdigest(content):
+    """
+    MD5 of UTF-8 encoded content, matching pm_encoder's checksum line.
+
+    The digest only identifies content, so it is requested with
+    usedforsecurity=False where supported (Python 3.9+) to avoid the
+    FIPS wrapper on some OpenSSL builds.
+    """
+    data = content.encode('utf-8')
+    try:
+        digest = hashlib.md5(data, usedforsecurity=False)
+    except TypeError:
+        digest = hashlib.md5(data)
+    return digest.hexdigest()
+
+
 def generate_basic_serialization_vector():
     """
     Vector 1: Basic file serialization
@@ -53,7 +69,7 @@ def generate_basic_serialization_vector():
         content = f.read()
     
     # Calculate MD5 (same algorithm pm_encoder uses)
-    md5_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+    md5_hash = md5_hexdigest(content)
     
     # Run pm_encoder on the fixtures directory
     with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
@@ -143,7 +159,7 @@ def generate_binary_detection_vector():
             f.write(text_content)
         
         # Calculate MD5 for text file
-        text_md5 = hashlib.md5(text_content.encode('utf-8')).hexdigest()
+        text_md5 = md5_hexdigest(text_content)
         
         # Run pm_encoder
         with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
@@ -233,7 +249,7 @@ def generate_large_file_skip_vector():
             f.write(small_content)
         
         # Calculate MD5 for small file
-        small_md5 = hashlib.md5(small_content.encode('utf-8')).hexdigest()
+        small_md5 = md5_hexdigest(small_content)
         
         # Run pm_encoder
         with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
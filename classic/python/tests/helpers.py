@@ -0,0 +1,22 @@
+"""
+Shared helpers for the classic Python test suite.
+
+Kept out of conftest.py so the modules also work under
+`python -m unittest discover -s tests` and when run as scripts.
+"""
+
+import os
+import tempfile
+
+
+def fast_tmpdir():
+    """
+    Create a temp directory, on tmpfs (/dev/shm) when it is writable.
+
+    The large-file and many-file tests are I/O bound; on Linux CI /tmp
+    may be disk-backed while /dev/shm is always in RAM.
+    """
+    base = "/dev/shm"
+    if not (os.path.isdir(base) and os.access(base, os.W_OK)):
+        base = None
+    return tempfile.mkdtemp(dir=base)
@@ -10,23 +10,130 @@ Tests:
 - Budget report inclusion methods
 """
 
+import argparse
 import unittest
 import sys
 from pathlib import Path
-from io import StringIO
+from unittest.mock import patch
 
-# Import from parent directory
-sys.path.insert(0, str(Path(__file__).parent.parent))
-import pm_encoder
+try:
+    import pm_encoder
+except ImportError:
+    # Run directly as a script: import from parent directory
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import pm_encoder
+
+
+# Python module with enough structure to truncate
+_PY_CODE = '''
+import os
+import sys
+
+class MyClass:
+    """A test class."""
+
+    def __init__(self, value):
+        """Initialize with value."""
+        self.value = value
+        self.data = []
+        for i in range(100):
+            self.data.append(i * 2)
+
+    def process(self, x):
+        """Process the input."""
+        result = x * self.value
+        for item in self.data:
+            result += item
+        return result
+
+def main():
+    """Main entry point."""
+    obj = MyClass(42)
+    for i in range(1000):
+        print(obj.process(i))
+
+if __name__ == "__main__":
+    main()
+'''
+
+# Python module large enough to exceed the hybrid 10% threshold
+_PY_LARGE = '''
+import os
+import sys
+import json
+
+class LargeClass:
+    """A large test class."""
+
+    def method_one(self, x):
+        """First method with lots of code."""
+        result = 0
+        for i in range(100):
+            result += i * x
+            if result > 1000:
+                result = result // 2
+        return result
+
+    def method_two(self, y):
+        """Second method with more code."""
+        data = []
+        for i in range(y):
+            data.append(i * 2)
+            data.append(i * 3)
+        return sum(data)
+
+    def method_three(self, z):
+        """Third method."""
+        return z * 42
+
+def helper_function(a, b, c):
+    """Helper function."""
+    return a + b + c
+
+def main():
+    """Main function."""
+    obj = LargeClass()
+    print(obj.method_one(10))
+    print(obj.method_two(20))
+    print(obj.method_three(30))
+
+if __name__ == "__main__":
+    main()
+'''
+
+_PY_LARGE_FILES = [
+    (Path("large.py"), _PY_LARGE),
+    (Path("small.txt"), "small content"),
+]
+
+
+class _HeuristicEstimator(pm_encoder.TokenEstimator):
+    """TokenEstimator pinned to heuristic mode for predictable tests."""
+    _tiktoken_available = False
+    _warning_shown = True
+
+
+_estimator_patch = patch.object(pm_encoder, "TokenEstimator", _HeuristicEstimator)
+
+
+def setUpModule():
+    """Swap in the heuristic estimator for the whole module."""
+    _estimator_patch.start()
+
+
+def tearDownModule():
+    """Restore the real token estimator."""
+    _estimator_patch.stop()
 
 
 class TestDropStrategy(unittest.TestCase):
     """Test the default 'drop' strategy behavior."""
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up test data."""
-        self.lens_manager = pm_encoder.LensManager()
-        self.lens_manager.active_lens_config = {
+        cls.lens_manager = pm_encoder.LensManager()
+        cls.lens_manager.active_lens_config = {
             "groups": [
                 {"pattern": "*.py", "priority": 100},
                 {"pattern": "*.txt", "priority": 50},
@@ -34,10 +141,6 @@ class TestDropStrategy(unittest.TestCase):
             "fallback": {"priority": 25}
         }
 
-        # Force heuristic mode for predictable tests
-        pm_encoder.TokenEstimator._tiktoken_available = False
-        pm_encoder.TokenEstimator._warning_shown = True
-
     def test_drop_strategy_drops_oversized(self):
         """Test that drop strategy skips files that don't fit."""
         files = [
@@ -72,63 +175,44 @@ class TestDropStrategy(unittest.TestCase):
         path, priority, tokens, method = report.included_files[0]
         self.assertEqual(method, "full")
 
+    def test_precomputed_estimates_are_used(self):
+        """Test that supplied estimates replace internal estimation."""
+        files = [
+            (Path("small.py"), "x" * 100),
+            (Path("other.py"), "x" * 100),
+        ]
+
+        selected, report = pm_encoder.apply_token_budget(
+            files, 500, self.lens_manager, strategy="drop",
+            estimates={Path("small.py"): 1000}
+        )
+
+        self.assertEqual([p.name for p, _ in selected], ["other.py"])
+        self.assertEqual(report.dropped_by_path[Path("small.py")][2], 1000)
+
 
 class TestTruncateStrategy(unittest.TestCase):
     """Test the 'truncate' strategy behavior."""
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up test data with analyzer registry."""
-        self.lens_manager = pm_encoder.LensManager()
-        self.lens_manager.active_lens_config = {
+        cls.lens_manager = pm_encoder.LensManager()
+        cls.lens_manager.active_lens_config = {
             "groups": [{"pattern": "*.py", "priority": 100}],
         }
 
-        self.analyzer_registry = pm_encoder.LanguageAnalyzerRegistry()
-
-        # Force heuristic mode
-        pm_encoder.TokenEstimator._tiktoken_available = False
-        pm_encoder.TokenEstimator._warning_shown = True
+        cls.analyzer_registry = pm_encoder.LanguageAnalyzerRegistry()
 
     def test_truncate_strategy_truncates_oversized(self):
         """Test that truncate strategy applies structure mode to oversized files."""
-        # Create a Python file with enough structure to truncate
-        python_code = '''
-import os
-import sys
-
-class MyClass:
-    """A test class."""
-
-    def __init__(self, value):
-        """Initialize with value."""
-        self.value = value
-        self.data = []
-        for i in range(100):
-            self.data.append(i * 2)
-
-    def process(self, x):
-        """Process the input."""
-        result = x * self.value
-        for item in self.data:
-            result += item
-        return result
-
-def main():
-    """Main entry point."""
-    obj = MyClass(42)
-    for i in range(1000):
-        print(obj.process(i))
-
-if __name__ == "__main__":
-    main()
-'''
         files = [
-            (Path("code.py"), python_code),
+            (Path("code.py"), _PY_CODE),
         ]
 
         # Set budget small enough that original doesn't fit, but truncated might
         original_tokens = pm_encoder.TokenEstimator.estimate_file_tokens(
-            Path("code.py"), python_code
+            Path("code.py"), _PY_CODE
         )
         budget = original_tokens // 2  # Half the original size
 
@@ -146,88 +230,34 @@ if __name__ == "__main__":
 class TestHybridStrategy(unittest.TestCase):
     """Test the 'hybrid' strategy behavior."""
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up test data."""
-        self.lens_manager = pm_encoder.LensManager()
-        self.lens_manager.active_lens_config = {
+        cls.lens_manager = pm_encoder.LensManager()
+        cls.lens_manager.active_lens_config = {
             "groups": [
                 {"pattern": "*.py", "priority": 100},
                 {"pattern": "*.txt", "priority": 50},
             ],
         }
 
-        self.analyzer_registry = pm_encoder.LanguageAnalyzerRegistry()
+        cls.analyzer_registry = pm_encoder.LanguageAnalyzerRegistry()
 
-        # Force heuristic mode
-        pm_encoder.TokenEstimator._tiktoken_available = False
-        pm_encoder.TokenEstimator._warning_shown = True
+        # Estimated once; large.py must be >10% of the budget
+        cls.large_tokens = pm_encoder.TokenEstimator.estimate_file_tokens(
+            Path("large.py"), _PY_LARGE
+        )
 
     def test_hybrid_auto_truncates_large_files(self):
         """Test that hybrid strategy auto-truncates files >10% of budget."""
-        # Create a Python file that will be >10% of budget
-        large_python = '''
-import os
-import sys
-import json
-
-class LargeClass:
-    """A large test class."""
-
-    def method_one(self, x):
-        """First method with lots of code."""
-        result = 0
-        for i in range(100):
-            result += i * x
-            if result > 1000:
-                result = result // 2
-        return result
-
-    def method_two(self, y):
-        """Second method with more code."""
-        data = []
-        for i in range(y):
-            data.append(i * 2)
-            data.append(i * 3)
-        return sum(data)
-
-    def method_three(self, z):
-        """Third method."""
-        return z * 42
-
-def helper_function(a, b, c):
-    """Helper function."""
-    return a + b + c
-
-def main():
-    """Main function."""
-    obj = LargeClass()
-    print(obj.method_one(10))
-    print(obj.method_two(20))
-    print(obj.method_three(30))
-
-if __name__ == "__main__":
-    main()
-'''
-        # Small file
-        small_txt = "small content"
-
-        files = [
-            (Path("large.py"), large_python),
-            (Path("small.txt"), small_txt),
-        ]
-
-        # Calculate budget where large.py is >10%
-        large_tokens = pm_encoder.TokenEstimator.estimate_file_tokens(
-            Path("large.py"), large_python
-        )
-
         # Set budget so large.py is ~20% of budget
-        budget = large_tokens * 5
+        budget = self.large_tokens * 5
 
         selected, report = pm_encoder.apply_token_budget(
-            files, budget, self.lens_manager,
+            _PY_LARGE_FILES, budget, self.lens_manager,
             strategy="hybrid",
-            analyzer_registry=self.analyzer_registry
+            analyzer_registry=self.analyzer_registry,
+            estimates={Path("large.py"): self.large_tokens}
         )
 
         self.assertEqual(report.strategy, "hybrid")
@@ -236,10 +266,7 @@ if __name__ == "__main__":
         self.assertEqual(len(selected), 2)
 
         # large.py should be truncated (it's >10% of budget)
-        large_entry = next(
-            (f for f in report.included_files if f[0].name == "large.py"),
-            None
-        )
+        large_entry = report.by_path.get(Path("large.py"))
         self.assertIsNotNone(large_entry)
         # The file should be marked as truncated since it exceeds 10% threshold
         self.assertEqual(large_entry[3], "truncated")
@@ -289,8 +316,29 @@ class TestBudgetReportMethods(unittest.TestCase):
         self.assertEqual(report.truncated_count, 2)
         self.assertEqual(report.selected_count, 3)
 
+    def test_report_lookup_by_path(self):
+        """Test that included and dropped entries can be looked up by path."""
+        report = pm_encoder.BudgetReport(
+            budget=10000,
+            used=3000,
+            selected_count=2,
+            dropped_count=1,
+            dropped_files=[(Path("dropped.py"), 50, 6000)],
+            estimation_method="Heuristic",
+            strategy="hybrid",
+            included_files=[
+                (Path("full1.py"), 100, 1000, "full"),
+                (Path("src/truncated1.py"), 90, 2000, "truncated"),
+            ],
+            truncated_count=1
+        )
+
+        self.assertEqual(report.by_path[Path("src/truncated1.py")][3], "truncated")
+        self.assertIsNone(report.by_path.get(Path("dropped.py")))
+        self.assertEqual(report.dropped_by_path[Path("dropped.py")][2], 6000)
+
     def test_report_print_shows_strategy(self):
-        """Test that print_report shows strategy."""
+        """Test that the report shows strategy."""
         report = pm_encoder.BudgetReport(
             budget=10000,
             used=5000,
@@ -306,16 +354,14 @@ class TestBudgetReportMethods(unittest.TestCase):
             truncated_count=1
         )
 
-        output = StringIO()
-        report.print_report(output)
-        result = output.getvalue()
+        result = report.format_report()
 
         self.assertIn("Strategy:   hybrid", result)
         self.assertIn("1 full, 1 truncated", result)
         self.assertIn("Auto-truncated files", result)
 
     def test_report_print_with_no_truncated(self):
-        """Test report print when no files were truncated."""
+        """Test report output when no files were truncated."""
         report = pm_encoder.BudgetReport(
             budget=10000,
             used=5000,
@@ -331,9 +377,7 @@ class TestBudgetReportMethods(unittest.TestCase):
             truncated_count=0
         )
 
-        output = StringIO()
-        report.print_report(output)
-        result = output.getvalue()
+        result = report.format_report()
 
         self.assertIn("2 full, 0 truncated", result)
         self.assertNotIn("Auto-truncated files", result)
@@ -344,8 +388,6 @@ class TestCLIStrategyflag(unittest.TestCase):
 
     def test_strategy_flag_accepted(self):
         """Test that --budget-strategy flag is parsed correctly."""
-        import argparse
-
         # Create parser similar to main()
         parser = argparse.ArgumentParser()
         parser.add_argument("project_root", type=Path, nargs='?')
@@ -366,8 +408,6 @@ class TestCLIStrategyflag(unittest.TestCase):
 
     def test_invalid_strategy_rejected(self):
         """Test that invalid strategy values are rejected."""
-        import argparse
-
         parser = argparse.ArgumentParser()
         parser.add_argument("--budget-strategy",
                           choices=["drop", "truncate", "hybrid"],
@@ -380,9 +420,10 @@ class TestCLIStrategyflag(unittest.TestCase):
 class TestTruncateToStructure(unittest.TestCase):
     """Test the _truncate_to_structure helper function."""
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up analyzer registry."""
-        self.analyzer_registry = pm_encoder.LanguageAnalyzerRegistry()
+        cls.analyzer_registry = pm_encoder.LanguageAnalyzerRegistry()
 
     def test_truncate_python_file(self):
         """Test structure truncation of Python file."""
@@ -412,6 +453,22 @@ class MyClass:
         self.assertIn("def my_function", content)
         self.assertIn("class MyClass", content)
 
+    def test_truncate_reuses_cached_result(self):
+        """Test that identical content is only analyzed once."""
+        python_code = "import os\n\ndef cached_fn():\n    return 1\n"
+        pm_encoder._STRUCTURE_CACHE.clear()
+
+        first = pm_encoder._truncate_to_structure(
+            Path("a.py"), python_code, self.analyzer_registry
+        )
+        with patch.object(pm_encoder.PythonAnalyzer, "get_structure_ranges") as ranges:
+            second = pm_encoder._truncate_to_structure(
+                Path("b.py"), python_code, self.analyzer_registry
+            )
+            ranges.assert_not_called()
+
+        self.assertEqual(first, second)
+
     def test_truncate_unsupported_file(self):
         """Test that unsupported files are not truncated."""
         content = "just some text content\nwith multiple lines\nand stuff"
@@ -439,14 +496,7 @@ class MyClass:
 def run_tests():
     """Run all budget strategy tests."""
     loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-
-    suite.addTests(loader.loadTestsFromTestCase(TestDropStrategy))
-    suite.addTests(loader.loadTestsFromTestCase(TestTruncateStrategy))
-    suite.addTests(loader.loadTestsFromTestCase(TestHybridStrategy))
-    suite.addTests(loader.loadTestsFromTestCase(TestBudgetReportMethods))
-    suite.addTests(loader.loadTestsFromTestCase(TestCLIStrategyflag))
-    suite.addTests(loader.loadTestsFromTestCase(TestTruncateToStructure))
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
 
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
@@ -112,6 +112,133 @@ class TestTokenEstimator(unittest.TestCase):
         finally:
             pm_encoder.TokenEstimator._tiktoken_available = original_available
 
+    def test_tiktoken_counts_are_cached(self):
+        """Test that repeated content is only encoded once."""
+        original_available = pm_encoder.TokenEstimator._tiktoken_available
+        original_encoding = pm_encoder.TokenEstimator._tiktoken_encoding
+
+        calls = []
+
+        class CountingEncoding:
+            def encode(self, text):
+                calls.append(text)
+                return text.split()
+
+        try:
+            pm_encoder.TokenEstimator._tiktoken_available = True
+            pm_encoder.TokenEstimator._tiktoken_encoding = CountingEncoding()
+            pm_encoder.TokenEstimator._token_cache.clear()
+
+            content = "alpha beta gamma"
+            self.assertEqual(pm_encoder.TokenEstimator.estimate_tokens(content), 3)
+            self.assertEqual(pm_encoder.TokenEstimator.estimate_tokens(content), 3)
+            self.assertEqual(len(calls), 1)
+
+        finally:
+            pm_encoder.TokenEstimator._tiktoken_available = original_available
+            pm_encoder.TokenEstimator._tiktoken_encoding = original_encoding
+            pm_encoder.TokenEstimator._token_cache.clear()
+
+    def test_full_cache_evicts_oldest_entry(self):
+        """Test that a full cache drops only its oldest count."""
+        original_max = pm_encoder.TokenEstimator._TOKEN_CACHE_MAX
+
+        try:
+            pm_encoder.TokenEstimator._TOKEN_CACHE_MAX = 3
+            pm_encoder.TokenEstimator._token_cache.clear()
+            for tokens, content in enumerate(["a", "b", "c", "d"]):
+                pm_encoder.TokenEstimator._cache_tokens(content, tokens)
+
+            self.assertEqual(
+                pm_encoder.TokenEstimator._token_cache, {"b": 1, "c": 2, "d": 3}
+            )
+
+        finally:
+            pm_encoder.TokenEstimator._TOKEN_CACHE_MAX = original_max
+            pm_encoder.TokenEstimator._token_cache.clear()
+
+    def test_file_token_batch_matches_single(self):
+        """Test that batch estimation agrees with per-file estimation."""
+        original_available = pm_encoder.TokenEstimator._tiktoken_available
+
+        try:
+            pm_encoder.TokenEstimator._tiktoken_available = False
+            pm_encoder.TokenEstimator._warning_shown = True
+
+            files = [
+                (Path("a.py"), "x" * 100),
+                (Path("src/b.txt"), "hello world"),
+                (Path("empty.md"), ""),
+            ]
+
+            batch = pm_encoder.TokenEstimator.estimate_file_tokens_batch(files)
+            single = [
+                pm_encoder.TokenEstimator.estimate_file_tokens(path, content)
+                for path, content in files
+            ]
+            self.assertEqual(batch, single)
+
+        finally:
+            pm_encoder.TokenEstimator._tiktoken_available = original_available
+
+    def test_tiktoken_batch_encodes_uncached_once(self):
+        """Test that batch estimation only encodes new, distinct texts."""
+        original_available = pm_encoder.TokenEstimator._tiktoken_available
+        original_encoding = pm_encoder.TokenEstimator._tiktoken_encoding
+
+        batches = []
+
+        class BatchEncoding:
+            def encode_batch(self, texts):
+                batches.append(list(texts))
+                return [text.split() for text in texts]
+
+        try:
+            pm_encoder.TokenEstimator._tiktoken_available = True
+            pm_encoder.TokenEstimator._tiktoken_encoding = BatchEncoding()
+            pm_encoder.TokenEstimator._token_cache.clear()
+            pm_encoder.TokenEstimator._token_cache["cached text"] = 7
+
+            counts = pm_encoder.TokenEstimator.estimate_tokens_batch(
+                ["one two", "cached text", "one two", "three"]
+            )
+
+            self.assertEqual(counts, [2, 7, 2, 1])
+            self.assertEqual(batches, [["one two", "three"]])
+
+        finally:
+            pm_encoder.TokenEstimator._tiktoken_available = original_available
+            pm_encoder.TokenEstimator._tiktoken_encoding = original_encoding
+            pm_encoder.TokenEstimator._token_cache.clear()
+
+    def test_tiktoken_batch_survives_eviction(self):
+        """Test that cache hits evicted mid-batch are still returned."""
+        original_available = pm_encoder.TokenEstimator._tiktoken_available
+        original_encoding = pm_encoder.TokenEstimator._tiktoken_encoding
+        original_max = pm_encoder.TokenEstimator._TOKEN_CACHE_MAX
+
+        class BatchEncoding:
+            def encode_batch(self, texts):
+                return [text.split() for text in texts]
+
+        try:
+            pm_encoder.TokenEstimator._tiktoken_available = True
+            pm_encoder.TokenEstimator._tiktoken_encoding = BatchEncoding()
+            pm_encoder.TokenEstimator._TOKEN_CACHE_MAX = 3
+            pm_encoder.TokenEstimator._token_cache.clear()
+            pm_encoder.TokenEstimator._token_cache.update({"a": 5, "b": 6, "c": 7})
+
+            counts = pm_encoder.TokenEstimator.estimate_tokens_batch(["a", "x y", "z"])
+
+            self.assertEqual(counts, [5, 2, 1])
+            self.assertNotIn("a", pm_encoder.TokenEstimator._token_cache)
+
+        finally:
+            pm_encoder.TokenEstimator._tiktoken_available = original_available
+            pm_encoder.TokenEstimator._tiktoken_encoding = original_encoding
+            pm_encoder.TokenEstimator._TOKEN_CACHE_MAX = original_max
+            pm_encoder.TokenEstimator._token_cache.clear()
+
     def test_get_method_heuristic(self):
         """Test method reporting for heuristic mode."""
         original_available = pm_encoder.TokenEstimator._tiktoken_available
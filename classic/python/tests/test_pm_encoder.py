@@ -8,38 +8,31 @@ Tests critical functionality including:
 - Language-specific structure extraction
 - Meta file injection
 - Ignore patterns
+
+Tests share no mutable state (each writes under its own directory in a
+per-process temp root), so the file can be run in parallel:
+    pytest -n auto tests/test_pm_encoder.py
 """
 
 import unittest
-import tempfile
 import shutil
 import json
 import sys
 from pathlib import Path
 from io import StringIO
 
-# Import from parent directory
-sys.path.insert(0, str(Path(__file__).parent.parent))
-import pm_encoder
-
-
-class TestStructureMode(unittest.TestCase):
-    """Test structure mode truncation logic."""
+try:
+    import pm_encoder
+except ImportError:
+    # Run directly as a script: import from parent directory
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import pm_encoder
 
-    def setUp(self):
-        """Create temporary test directory."""
-        self.test_dir = tempfile.mkdtemp()
-        self.test_path = Path(self.test_dir)
+from helpers import fast_tmpdir
 
-    def tearDown(self):
-        """Clean up temporary directory."""
-        shutil.rmtree(self.test_dir)
 
-    def test_structure_mode_trigger(self):
-        """Test that structure mode works even when truncate=0 (the bug fix)."""
-        # Create a Python file with class and function
-        py_file = self.test_path / "test.py"
-        py_file.write_text("""import os
+# Python module serialized by test_structure_mode_trigger
+_PY_TRIGGER_SAMPLE = """import os
 import sys
 
 class MyClass:
@@ -57,48 +50,17 @@ def standalone_function():
     print("Hello")
     print("World")
     return 42
-""")
-
-        # Serialize with structure mode but truncate=0
-        output = StringIO()
-        pm_encoder.serialize(
-            self.test_path,
-            output,
-            ignore_patterns=[".git"],
-            include_patterns=[],
-            sort_by="name",
-            sort_order="asc",
-            truncate_lines=0,  # BUG FIX: structure mode should still work!
-            truncate_mode="structure",
-            truncate_summary=True,
-            truncate_exclude=[],
-            show_stats=False,
-            language_plugins_dir=None,
-            lens_manager=None
-        )
-
-        result = output.getvalue()
-
-        # Verify structure mode was applied
-        self.assertIn("import os", result)
-        self.assertIn("import sys", result)
-        self.assertIn("class MyClass:", result)
-        self.assertIn("def __init__(self):", result)
-        self.assertIn("def method_one(self):", result)
-        self.assertIn("def standalone_function():", result)
-
-        # Verify implementation details were REMOVED
-        self.assertNotIn("self.x = 1", result)
-        self.assertNotIn("result = self.x + self.y", result)
-        self.assertNotIn('print("Hello")', result)
+"""
 
-        # Verify structure mode marker is present
-        self.assertIn("STRUCTURE MODE", result)
+# Config-style JSON that structure mode must leave to the smart fallback
+_JSON_SAMPLE = json.dumps({
+    "key1": "value1",
+    "key2": "value2",
+    "nested": {"a": 1, "b": 2}
+}, indent=2)
 
-    def test_python_structure(self):
-        """Test Python structure extraction preserves signatures, removes bodies."""
-        py_file = self.test_path / "module.py"
-        py_file.write_text("""from typing import List
+# Samples for the per-language structure extraction tests
+_PY_STRUCTURE_SAMPLE = """from typing import List
 
 @decorator
 def decorated_function(arg1: str, arg2: int) -> bool:
@@ -112,35 +74,9 @@ class DataProcessor:
         for item in data:
             print(item)
         return True
-""")
-
-        analyzer = pm_encoder.PythonAnalyzer()
-        lines = py_file.read_text().split('\n')
-        structure_ranges = analyzer.get_structure_ranges(lines)
+"""
 
-        # Extract structure lines
-        kept_lines = []
-        for start, end in structure_ranges:
-            kept_lines.extend(lines[start-1:end])
-        structure_output = '\n'.join(kept_lines)
-
-        # Should include
-        self.assertIn("from typing import List", structure_output)
-        self.assertIn("@decorator", structure_output)
-        self.assertIn("def decorated_function(arg1: str, arg2: int) -> bool:", structure_output)
-        self.assertIn("class DataProcessor:", structure_output)
-        self.assertIn("def process(self, data: List[str]):", structure_output)
-
-        # Should NOT include (implementation details)
-        self.assertNotIn("x = arg1.upper()", structure_output)
-        self.assertNotIn("y = arg2 * 2", structure_output)
-        self.assertNotIn("for item in data:", structure_output)
-        self.assertNotIn("print(item)", structure_output)
-
-    def test_js_structure(self):
-        """Test JavaScript/TypeScript structure extraction."""
-        js_file = self.test_path / "app.js"
-        js_file.write_text("""import React from 'react';
+_JS_STRUCTURE_SAMPLE = """import React from 'react';
 import { useState } from 'react';
 
 export class Component {
@@ -165,60 +101,9 @@ function helperFunction(x, y) {
     const product = x * y;
     return { sum, product };
 }
-""")
-
-        analyzer = pm_encoder.JavaScriptAnalyzer()
-        lines = js_file.read_text().split('\n')
-        structure_ranges = analyzer.get_structure_ranges(lines)
-
-        kept_lines = []
-        for start, end in structure_ranges:
-            kept_lines.extend(lines[start-1:end])
-        structure_output = '\n'.join(kept_lines)
-
-        # Should include
-        self.assertIn("import React from 'react'", structure_output)
-        self.assertIn("export class Component {", structure_output)
-        self.assertIn("export const useCustomHook = (initial) =>", structure_output)
-
-        # Should NOT include detailed implementation
-        self.assertNotIn("this.state = { count: 0 }", structure_output)
-        self.assertNotIn("const sum = x + y", structure_output)
-
-    def test_json_fallback(self):
-        """Test that JSON files are NOT truncated in structure mode (fallback to smart)."""
-        json_file = self.test_path / "data.json"
-        json_content = json.dumps({
-            "key1": "value1",
-            "key2": "value2",
-            "nested": {"a": 1, "b": 2}
-        }, indent=2)
-        json_file.write_text(json_content)
-
-        analyzer = pm_encoder.JSONAnalyzer()
-        lines = json_content.split('\n')
-        structure_ranges = analyzer.get_structure_ranges(lines)
-
-        # JSON should not support structure mode (should return empty list)
-        self.assertEqual(structure_ranges, [])
-
-        # Test that truncate_content falls back to smart mode
-        truncated, was_truncated, analysis = pm_encoder.truncate_content(
-            json_content,
-            Path("data.json"),
-            max_lines=1000,
-            mode='structure',
-            analyzer_registry=pm_encoder.LanguageAnalyzerRegistry(),
-            include_summary=True
-        )
-
-        # Should have JSON content (fallback worked)
-        self.assertIn("key1", truncated)
-        self.assertIn("value1", truncated)
+"""
 
-    def test_rust_structure(self):
-        """Test Rust structure extraction preserves signatures, removes bodies."""
-        rust_content = """use std::io;
+_RUST_STRUCTURE_SAMPLE = """use std::io;
 use std::collections::HashMap;
 
 pub struct Config {
@@ -255,58 +140,194 @@ fn main() {
     println!("Value: {}", config.value);
 }
 """
-        analyzer = pm_encoder.RustAnalyzer()
-        lines = rust_content.split('\n')
-        structure_ranges = analyzer.get_structure_ranges(lines)
 
-        # Extract structure lines
-        kept_lines = []
-        for start, end in structure_ranges:
-            kept_lines.extend(lines[start-1:end])
-        structure_output = '\n'.join(kept_lines)
+# Analyzers are stateless, so tests share one registry and one of each
+_REGISTRY = pm_encoder.LanguageAnalyzerRegistry()
+_ANALYZERS = {
+    "python": pm_encoder.PythonAnalyzer(),
+    "javascript": pm_encoder.JavaScriptAnalyzer(),
+    "rust": pm_encoder.RustAnalyzer(),
+}
 
-        # Should include use statements
-        self.assertIn("use std::io", structure_output)
-        self.assertIn("use std::collections::HashMap", structure_output)
 
-        # Should include struct definition
-        self.assertIn("pub struct Config {", structure_output)
+def assert_substrings(test, haystack, present=(), absent=()):
+    """
+    Assert every `present` substring occurs in haystack and no `absent` one does.
+
+    Unlike a chain of assertIn/assertNotIn, a failure reports every
+    missing and every unexpected substring at once.
+    """
+    missing = [s for s in present if s not in haystack]
+    unexpected = [s for s in absent if s in haystack]
+    if missing or unexpected:
+        test.fail(f"missing: {missing}; unexpected: {unexpected}")
+
+
+def write_tree(root, files):
+    """Write {relative path: text} under root, creating parent dirs as needed."""
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(text.encode("utf-8"))
+
+
+# serialize() options shared by the tests; each overrides only what it tests
+_SERIALIZE_DEFAULTS = {
+    "ignore_patterns": [".git"],
+    "include_patterns": [],
+    "sort_by": "name",
+    "sort_order": "asc",
+    "truncate_lines": 0,
+    "truncate_mode": "simple",
+    "truncate_summary": True,
+    "truncate_exclude": [],
+    "show_stats": False,
+    "language_plugins_dir": None,
+    "lens_manager": None,
+}
 
-        # Should include impl block
-        self.assertIn("impl Config {", structure_output)
 
-        # Should include function signatures
-        self.assertIn("pub fn new(name: String) -> Self {", structure_output)
-        self.assertIn("pub fn set_value(&mut self, val: i32) {", structure_output)
+# Module-wide temp root; each test gets its own subdirectory under it and
+# everything is removed once in tearDownModule
+_TMP = None
 
-        # Should include trait definition
-        self.assertIn("pub trait Processable {", structure_output)
 
-        # Should include async fn signature
-        self.assertIn("pub async fn async_handler(data: Vec<u8>) -> Result<(), io::Error> {", structure_output)
+def setUpModule():
+    """Create the temp root once, on tmpfs (/dev/shm) when it is writable."""
+    global _TMP
+    _TMP = Path(fast_tmpdir())
 
-        # Should include main function
-        self.assertIn("fn main() {", structure_output)
 
-        # Should NOT include implementation details
-        self.assertNotIn("name,", structure_output)
-        self.assertNotIn("value: 0,", structure_output)
-        self.assertNotIn("self.value = val;", structure_output)
-        self.assertNotIn("let processed = data.iter()", structure_output)
-        self.assertNotIn('println!("Value: {}", config.value);', structure_output)
+def tearDownModule():
+    """Remove the temp root and every test directory under it."""
+    shutil.rmtree(_TMP, ignore_errors=True)
+
+
+class TestStructureMode(unittest.TestCase):
+    """Test structure mode truncation logic."""
+
+    def setUp(self):
+        """Create this test's directory under the module temp root."""
+        self.test_path = _TMP / self.id()
+        self.test_path.mkdir()
+
+    def test_structure_mode_trigger(self):
+        """Test that structure mode works even when truncate=0 (the bug fix)."""
+        # Create a Python file with class and function
+        py_file = self.test_path / "test.py"
+        py_file.write_text(_PY_TRIGGER_SAMPLE)
+
+        # Serialize with structure mode but truncate=0
+        output = StringIO()
+        pm_encoder.serialize(
+            self.test_path,
+            output,
+            **{**_SERIALIZE_DEFAULTS,
+               # BUG FIX: structure mode should still work with truncate_lines=0!
+               "truncate_mode": "structure"}
+        )
+
+        result = output.getvalue()
+
+        # Verify structure mode was applied (signatures and the marker
+        # kept) and implementation details were REMOVED
+        assert_substrings(
+            self, result,
+            present=["import os", "import sys", "class MyClass:",
+                     "def __init__(self):", "def method_one(self):",
+                     "def standalone_function():", "STRUCTURE MODE"],
+            absent=["self.x = 1", "result = self.x + self.y", 'print("Hello")'],
+        )
+
+
+class TestStructureExtraction(unittest.TestCase):
+    """Test per-language structure extraction on in-memory samples (no files)."""
+
+    # (language, sample, lines that must be kept, lines that must go)
+    STRUCTURE_CASES = [
+        ("python", _PY_STRUCTURE_SAMPLE,
+         ["from typing import List",
+          "@decorator",
+          "def decorated_function(arg1: str, arg2: int) -> bool:",
+          "class DataProcessor:",
+          "def process(self, data: List[str]):"],
+         ["x = arg1.upper()",
+          "y = arg2 * 2",
+          "for item in data:",
+          "print(item)"]),
+        ("javascript", _JS_STRUCTURE_SAMPLE,
+         ["import React from 'react'",
+          "export class Component {",
+          "export const useCustomHook = (initial) =>"],
+         ["this.state = { count: 0 }",
+          "const sum = x + y"]),
+        ("rust", _RUST_STRUCTURE_SAMPLE,
+         # use statements, struct, impl block, fn/trait/async fn signatures
+         ["use std::io",
+          "use std::collections::HashMap",
+          "pub struct Config {",
+          "impl Config {",
+          "pub fn new(name: String) -> Self {",
+          "pub fn set_value(&mut self, val: i32) {",
+          "pub trait Processable {",
+          "pub async fn async_handler(data: Vec<u8>) -> Result<(), io::Error> {",
+          "fn main() {"],
+         ["name,",
+          "value: 0,",
+          "self.value = val;",
+          "let processed = data.iter()",
+          'println!("Value: {}", config.value);']),
+    ]
+
+    def test_language_structure(self):
+        """Test structure extraction preserves signatures, removes bodies."""
+        for lang, sample, kept, removed in self.STRUCTURE_CASES:
+            with self.subTest(lang=lang):
+                lines = sample.split('\n')
+                structure_ranges = _ANALYZERS[lang].get_structure_ranges(lines)
+
+                # Extract structure lines
+                kept_lines = []
+                for start, end in structure_ranges:
+                    kept_lines.extend(lines[start-1:end])
+                structure_output = '\n'.join(kept_lines)
+
+                # Implementation details must not survive
+                assert_substrings(self, structure_output, present=kept, absent=removed)
+
+    def test_json_fallback(self):
+        """Test that JSON files are NOT truncated in structure mode (fallback to smart)."""
+        json_content = _JSON_SAMPLE
+
+        analyzer = pm_encoder.JSONAnalyzer()
+        lines = json_content.split('\n')
+        structure_ranges = analyzer.get_structure_ranges(lines)
+
+        # JSON should not support structure mode (should return empty list)
+        self.assertEqual(structure_ranges, [])
+
+        # Test that truncate_content falls back to smart mode
+        truncated, was_truncated, analysis = pm_encoder.truncate_content(
+            json_content,
+            Path("data.json"),
+            max_lines=1000,
+            mode='structure',
+            analyzer_registry=_REGISTRY,
+            include_summary=True
+        )
+
+        # Should have JSON content (fallback worked)
+        self.assertIn("key1", truncated)
+        self.assertIn("value1", truncated)
 
 
 class TestLenses(unittest.TestCase):
     """Test Context Lenses functionality."""
 
     def setUp(self):
-        """Create temporary test directory."""
-        self.test_dir = tempfile.mkdtemp()
-        self.test_path = Path(self.test_dir)
-
-    def tearDown(self):
-        """Clean up temporary directory."""
-        shutil.rmtree(self.test_dir)
+        """Create this test's directory under the module temp root."""
+        self.test_path = _TMP / self.id()
+        self.test_path.mkdir()
 
     def test_meta_injection(self):
         """Test that .pm_encoder_meta file is injected when using a lens."""
@@ -348,10 +369,13 @@ class TestLenses(unittest.TestCase):
         result = output.getvalue()
 
         # Verify .pm_encoder_meta is present
-        self.assertIn("++++++++++ .pm_encoder_meta ++++++++++", result)
-        self.assertIn('Context generated with lens: "architecture"', result)
-        self.assertIn("Focus: High-level code structure and configuration", result)
-        self.assertIn("pm_encoder version:", result)
+        assert_substrings(
+            self, result,
+            present=["++++++++++ .pm_encoder_meta ++++++++++",
+                     'Context generated with lens: "architecture"',
+                     "Focus: High-level code structure and configuration",
+                     "pm_encoder version:"],
+        )
 
     def test_lens_precedence(self):
         """Test that lens configuration precedence works correctly."""
@@ -397,64 +421,50 @@ class TestIgnorePatterns(unittest.TestCase):
     """Test ignore patterns functionality."""
 
     def setUp(self):
-        """Create temporary test directory."""
-        self.test_dir = tempfile.mkdtemp()
-        self.test_path = Path(self.test_dir)
-
-    def tearDown(self):
-        """Clean up temporary directory."""
-        shutil.rmtree(self.test_dir)
+        """Create this test's directory under the module temp root."""
+        self.test_path = _TMP / self.id()
+        self.test_path.mkdir()
 
     def test_ignore_patterns(self):
         """Test that .git and other ignore patterns are respected."""
         # Create directory structure
-        (self.test_path / ".git").mkdir()
-        (self.test_path / ".git" / "config").write_text("git config")
-        (self.test_path / "__pycache__").mkdir()
-        (self.test_path / "__pycache__" / "cache.pyc").write_text("cache")
-        (self.test_path / "src").mkdir()
-        (self.test_path / "src" / "main.py").write_text("print('main')")
-        (self.test_path / "test.log").write_text("log data")
+        write_tree(self.test_path, {
+            ".git/config": "git config",
+            "__pycache__/cache.pyc": "cache",
+            "src/main.py": "print('main')",
+            "test.log": "log data",
+        })
 
         output = StringIO()
         pm_encoder.serialize(
             self.test_path,
             output,
-            ignore_patterns=[".git", "__pycache__", "*.log"],
-            include_patterns=[],
-            sort_by="name",
-            sort_order="asc",
-            truncate_lines=0,
-            truncate_mode="simple",
-            truncate_summary=True,
-            truncate_exclude=[],
-            show_stats=False,
-            language_plugins_dir=None,
-            lens_manager=None
+            **{**_SERIALIZE_DEFAULTS,
+               "ignore_patterns": [".git", "__pycache__", "*.log"]}
         )
 
         result = output.getvalue()
 
-        # Should include
-        self.assertIn("src/main.py", result)
-        self.assertIn("print('main')", result)
-
-        # Should NOT include (ignored)
-        self.assertNotIn(".git", result)
-        self.assertNotIn("git config", result)
-        self.assertNotIn("__pycache__", result)
-        self.assertNotIn("cache.pyc", result)
-        self.assertNotIn("test.log", result)
-        self.assertNotIn("log data", result)
+        # src/ is included; ignored paths and their contents are not
+        assert_substrings(
+            self, result,
+            present=["src/main.py", "print('main')"],
+            absent=[".git", "git config", "__pycache__", "cache.pyc",
+                    "test.log", "log data"],
+        )
 
 
 class TestBuiltInLenses(unittest.TestCase):
     """Test built-in lenses are properly defined."""
 
+    @classmethod
+    def setUpClass(cls):
+        """One manager for the class; these tests only read its built-ins."""
+        cls.lens_manager = pm_encoder.LensManager()
+
     def test_all_lenses_exist(self):
         """Test that all 4 built-in lenses exist."""
-        lens_manager = pm_encoder.LensManager()
-        lenses = lens_manager.BUILT_IN_LENSES
+        lenses = self.lens_manager.BUILT_IN_LENSES
 
         self.assertIn("architecture", lenses)
         self.assertIn("debug", lenses)
@@ -463,8 +473,7 @@ class TestBuiltInLenses(unittest.TestCase):
 
     def test_architecture_lens_has_safety_limit(self):
         """Test that architecture lens has the safety limit (v1.2.1 fix)."""
-        lens_manager = pm_encoder.LensManager()
-        arch_lens = lens_manager.BUILT_IN_LENSES["architecture"]
+        arch_lens = self.lens_manager.BUILT_IN_LENSES["architecture"]
 
         self.assertEqual(arch_lens["truncate"], 2000)
         self.assertEqual(arch_lens["truncate_mode"], "structure")
@@ -472,18 +481,13 @@ class TestBuiltInLenses(unittest.TestCase):
 
 def run_tests():
     """Run all tests and print results."""
-    # Create test suite
+    # Create test suite from every TestCase in this module
     loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-
-    # Add all test classes
-    suite.addTests(loader.loadTestsFromTestCase(TestStructureMode))
-    suite.addTests(loader.loadTestsFromTestCase(TestLenses))
-    suite.addTests(loader.loadTestsFromTestCase(TestIgnorePatterns))
-    suite.addTests(loader.loadTestsFromTestCase(TestBuiltInLenses))
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
 
-    # Run tests with verbose output
-    runner = unittest.TextTestRunner(verbosity=2)
+    # Per-test lines only with -v; the summary below is always printed
+    verbosity = 2 if "-v" in sys.argv[1:] else 1
+    runner = unittest.TextTestRunner(verbosity=verbosity)
     result = runner.run(suite)
 
     # Print summary
@@ -17,6 +17,7 @@ Outputs:
 
 Part of: Research Phase 2.5 - The Interface Parity Protocol
 """
+import contextlib
 import json
 import re
 import subprocess
@@ -31,6 +32,9 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 CONTRACT_PATH = PROJECT_ROOT / "test_vectors" / "cli_contract.json"
 RUST_BINARY = PROJECT_ROOT / "rust" / "target" / "debug" / "pm_encoder"
 
+# Set once the binary is known to exist; it doesn't disappear mid-run
+_RUST_BINARY_READY = False
+
 
 @dataclass
 class ValidationResult:
@@ -61,12 +65,19 @@ def load_contract() -> Dict:
         return json.load(f)
 
 
-def run_rust_cli(args: List[str], timeout: int = 5) -> Tuple[int, str, str]:
+def _ensure_rust_ready() -> Tuple[bool, str]:
     """
-    Run the Rust binary with given arguments.
+    Make sure the Rust binary exists, building it on first use.
 
-    Returns: (exit_code, stdout, stderr)
+    The existence check is only performed until it first succeeds, so
+    repeated flag probes don't each pay for a stat() call.
+
+    Returns: (ready, error_message)
     """
+    global _RUST_BINARY_READY
+    if _RUST_BINARY_READY:
+        return (True, "")
+
     if not RUST_BINARY.exists():
         # Try to build first
         print("Building Rust binary...")
@@ -77,7 +88,21 @@ def run_rust_cli(args: List[str], timeout: int = 5) -> Tuple[int, str, str]:
             text=True
         )
         if build_result.returncode != 0:
-            return (-1, "", f"Build failed: {build_result.stderr}")
+            return (False, f"Build failed: {build_result.stderr}")
+
+    _RUST_BINARY_READY = True
+    return (True, "")
+
+
+def run_rust_cli(args: List[str], timeout: int = 5) -> Tuple[int, str, str]:
+    """
+    Run the Rust binary with given arguments.
+
+    Returns: (exit_code, stdout, stderr)
+    """
+    ready, error = _ensure_rust_ready()
+    if not ready:
+        return (-1, "", error)
 
     try:
         result = subprocess.run(
@@ -246,6 +271,23 @@ def calculate_parity(results: List[ValidationResult], contract: Dict) -> Dict:
     }
 
 
+def result_record(result: ValidationResult) -> Dict:
+    """Machine-readable summary of a single validation result."""
+    return {
+        "name": result.name,
+        "category": result.category,
+        "passed": result.passed,
+        "flag_exists": result.flag_exists,
+        "in_help": result.in_help
+    }
+
+
+def emit_ndjson(kind: str, record: Dict, stream) -> None:
+    """Write one NDJSON record tagged with its kind and flush it immediately."""
+    stream.write(json.dumps({"kind": kind, **record}) + "\n")
+    stream.flush()
+
+
 def print_report(results: List[ValidationResult], metrics: Dict, version_ok: bool, version_msg: str):
     """Print a human-readable validation report."""
     print("\n" + "=" * 60)
@@ -283,62 +325,72 @@ def print_report(results: List[ValidationResult], metrics: Dict, version_ok: boo
     print("\n" + "=" * 60)
 
 
-def main(output_json: bool = False):
-    """Run the CLI parity validation."""
-    print("CLI Parity Validator")
-    print("-" * 40)
-
-    # Load contract
-    contract = load_contract()
-    print(f"Contract loaded: {len(contract['arguments'])} arguments")
-    print(f"Reference version: {contract['reference_version']}")
+def main(output_json: bool = False, ndjson: bool = False):
+    """
+    Run the CLI parity validation.
 
-    # Get Rust help text
-    print("\nFetching Rust --help output...")
-    code, help_text, stderr = run_rust_cli(["--help"])
-    if code != 0:
-        print(f"Error getting help: {stderr}")
-        help_text = ""
-
-    # Validate version
-    print("Validating --version...")
-    version_ok, version_msg = validate_version(contract)
-
-    # Validate each argument
-    print("Validating arguments...")
-    results = []
-    for arg in contract["arguments"]:
-        result = validate_argument(arg, help_text)
-        results.append(result)
-
-    # Calculate metrics
-    metrics = calculate_parity(results, contract)
-
-    # Print report
-    print_report(results, metrics, version_ok, version_msg)
-
-    # Output JSON if requested
-    if output_json:
-        output = {
-            "version_ok": version_ok,
-            "version_msg": version_msg,
-            "metrics": metrics,
-            "results": [
-                {
-                    "name": r.name,
-                    "category": r.category,
-                    "passed": r.passed,
-                    "flag_exists": r.flag_exists,
-                    "in_help": r.in_help
-                }
-                for r in results
-            ]
-        }
-        output_path = PROJECT_ROOT / "research" / "data" / "cli_parity.json"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "w") as f:
-            json.dump(output, f, indent=2)
-        print(f"\nJSON output: {output_path}")
+    With ndjson=True, one JSON record per line is streamed to stdout as each
+    argument is validated (kind "result"), followed by a final "metrics"
+    record. The human-readable report is sent to stderr in that mode so the
+    stdout stream stays machine-parseable.
+    """
+    records = sys.stdout
+    report_stream = sys.stderr if ndjson else sys.stdout
+
+    with contextlib.redirect_stdout(report_stream):
+        print("CLI Parity Validator")
+        print("-" * 40)
+
+        # Load contract
+        contract = load_contract()
+        print(f"Contract loaded: {len(contract['arguments'])} arguments")
+        print(f"Reference version: {contract['reference_version']}")
+
+        # Get Rust help text
+        print("\nFetching Rust --help output...")
+        code, help_text, stderr = run_rust_cli(["--help"])
+        if code != 0:
+            print(f"Error getting help: {stderr}")
+            help_text = ""
+
+        # Validate version
+        print("Validating --version...")
+        version_ok, version_msg = validate_version(contract)
+
+        # Validate each argument
+        print("Validating arguments...")
+        results = []
+        for arg in contract["arguments"]:
+            result = validate_argument(arg, help_text)
+            results.append(result)
+            if ndjson:
+                emit_ndjson("result", result_record(result), records)
+
+        # Calculate metrics
+        metrics = calculate_parity(results, contract)
+        if ndjson:
+            emit_ndjson("metrics", {
+                "version_ok": version_ok,
+                "version_msg": version_msg,
+                **metrics
+            }, records)
+
+        # Print report
+        print_report(results, metrics, version_ok, version_msg)
+
+        # Output JSON if requested
+        if output_json:
+            output = {
+                "version_ok": version_ok,
+                "version_msg": version_msg,
+                "metrics": metrics,
+                "results": [result_record(r) for r in results]
+            }
+            output_path = PROJECT_ROOT / "research" / "data" / "cli_parity.json"
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, "w") as f:
+                json.dump(output, f, indent=2)
+            print(f"\nJSON output: {output_path}")
 
     return metrics["interface_parity_percent"]
 
@@ -347,7 +399,9 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Verify CLI parity between Python and Rust")
     parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Stream results to stdout as NDJSON (report goes to stderr)")
     args = parser.parse_args()
 
-    parity = main(output_json=args.json)
+    parity = main(output_json=args.json, ndjson=args.ndjson)
     sys.exit(0 if parity >= 50 else 1)